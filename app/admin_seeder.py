@@ -1,6 +1,7 @@
 from app.auth import get_password_hash
 from app.database import SessionLocal
 from app.models import User
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 import os
 
 def seed_admin_user():
@@ -8,8 +9,8 @@ def seed_admin_user():
     Seed an admin user in the database.
 
     This function retrieves the admin credentials (email and password) from environment variables.
-    It checks if an admin user already exists in the database. If not, it creates one with the given
-    credentials.
+    It inserts the admin user with a single `INSERT ... ON CONFLICT DO NOTHING`, so an existing
+    user with the same email is left untouched.
 
     Side Effects:
         - Adds a new admin user to the database if one does not exist.
@@ -30,18 +31,16 @@ def seed_admin_user():
         return
 
     try:
-        # Check if the admin user already exists
-        existing_admin = db.query(User).filter(User.email == admin_email).first()
-        if not existing_admin:
-            hashed_password = get_password_hash(admin_password)
-            admin_user = User(
-                email=admin_email,
-                username="admin",
-                hashed_password=hashed_password,
-                is_admin=True
-            )
-            db.add(admin_user)
-            db.commit()
+        # The password is hashed unconditionally: this only runs once at boot
+        stmt = sqlite_insert(User).values(
+            email=admin_email,
+            username="admin",
+            hashed_password=get_password_hash(admin_password),
+            is_admin=True
+        ).on_conflict_do_nothing(index_elements=["email"])
+        result = db.execute(stmt)
+        db.commit()
+        if result.rowcount:
             print("Admin user created successfully.")
         else:
             print("Admin user already exists.")
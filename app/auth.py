@@ -1,10 +1,18 @@
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from http.client import HTTPException
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import statistics
+import threading
+import time
+import jwt
+from jwt import InvalidTokenError as JWTError
+import bcrypt
+from cachetools import TTLCache
 from app import models
 from app.database import get_db
+from sqlalchemy import bindparam, lambda_stmt, select
 from sqlalchemy.orm import Session
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
@@ -15,11 +23,60 @@ load_dotenv()
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
+_ALGORITHMS = [ALGORITHM]
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60))
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+BCRYPT_TARGET_MS = int(os.getenv("BCRYPT_TARGET_MS", 250))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# Dedicated to bcrypt so hashing bursts cannot starve the threadpool that runs
+# sync request handlers. bcrypt releases the GIL, so one thread per core scales.
+_hash_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="bcrypt")
+
+# Decoded bearer tokens: token -> (email, user_id, exp). Process-local on purpose,
+# so rotating SECRET_KEY only requires a restart to take effect.
+_token_cache = TTLCache(maxsize=4096, ttl=30)
+# Resolved users: email -> user_id, so a new token for a known user is a PK lookup
+_user_id_cache = TTLCache(maxsize=1024, ttl=60)
+_token_cache_lock = threading.Lock()
+
+# Built once so the SELECT is compiled once per process, not once per request
+_user_by_email = lambda_stmt(
+    lambda: select(models.User).where(models.User.email == bindparam("email"))
+)
+
+def _encode_password(password: str) -> bytes:
+    # bcrypt only uses the first 72 bytes; truncate explicitly since newer
+    # bcrypt releases raise instead of silently ignoring the rest.
+    return password.encode("utf-8")[:72]
+
+def calibrate_bcrypt_rounds(target_ms: int = BCRYPT_TARGET_MS, min_rounds: int = 12, max_rounds: int = 14, samples: int = 3) -> int:
+    """
+    Pick the largest bcrypt cost factor whose hash time fits the target on this host.
+
+    Args:
+        target_ms (int): The maximum acceptable median hash time in milliseconds.
+        min_rounds (int): The lowest cost factor to consider; defaults to the fixed cost of 12.
+        max_rounds (int): The highest cost factor to consider.
+        samples (int): The number of hashes timed per cost factor.
+
+    Returns:
+        int: The chosen cost factor, never lower than `min_rounds`.
+    """
+    chosen = min_rounds
+    for rounds in range(min_rounds, max_rounds + 1):
+        timings = []
+        for _ in range(samples):
+            start = time.perf_counter()
+            bcrypt.hashpw(b"x", bcrypt.gensalt(rounds=rounds))
+            timings.append((time.perf_counter() - start) * 1000)
+        if statistics.median(timings) > target_ms:
+            # Each extra round doubles the cost, so higher ones cannot fit either
+            break
+        chosen = rounds
+    return chosen
+
 def verify_password(plain_password, hashed_password):
     """
     Verify if a plain text password matches a hashed password.
@@ -31,7 +88,7 @@ def verify_password(plain_password, hashed_password):
     Returns:
         bool: True if the password matches, False otherwise.
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return bcrypt.checkpw(_encode_password(plain_password), hashed_password.encode("utf-8"))
 
 def get_password_hash(password):
     """
@@ -43,7 +100,39 @@ def get_password_hash(password):
     Returns:
         str: The hashed password.
     """
-    return pwd_context.hash(password)
+    return bcrypt.hashpw(_encode_password(password), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode("utf-8")
+
+async def async_verify_password(plain_password, hashed_password):
+    """
+    Verify a password from an `async def` handler without blocking the event loop.
+
+    bcrypt is deliberately slow, so async handlers must use this instead of
+    `verify_password`. Sync (`def`) handlers already run in FastAPI's threadpool
+    and can call `verify_password` directly.
+
+    Args:
+        plain_password (str): The plain text password provided by the user.
+        hashed_password (str): The stored hashed password.
+
+    Returns:
+        bool: True if the password matches, False otherwise.
+    """
+    return await asyncio.get_running_loop().run_in_executor(_hash_executor, verify_password, plain_password, hashed_password)
+
+async def async_get_password_hash(password):
+    """
+    Hash a password from an `async def` handler without blocking the event loop.
+
+    Async handlers must use this instead of `get_password_hash`; sync handlers
+    such as signup, login and update_user can keep calling the blocking version.
+
+    Args:
+        password (str): The plain text password to be hashed.
+
+    Returns:
+        str: The hashed password.
+    """
+    return await asyncio.get_running_loop().run_in_executor(_hash_executor, get_password_hash, password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """
@@ -57,21 +146,25 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         str: The encoded JWT token.
     """
     to_encode = data.copy()
+    now = datetime.now(timezone.utc)
     if expires_delta:
-        expire = datetime.now() + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.now() + timedelta(minutes=15)
+        expire = now + timedelta(minutes=15)
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(
+def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ) -> models.User:
     """
     Retrieve the currently authenticated user based on the provided token.
 
+    This is a plain `def` on purpose: FastAPI runs it in the threadpool, so its
+    blocking database queries never stall the event loop.
+
     Args:
         token (str): The OAuth2 bearer token.
         db (Session): The SQLAlchemy database session.
@@ -88,20 +181,68 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
+    with _token_cache_lock:
+        cached = _token_cache.get(token)
+        if cached is not None and cached[2] <= time.time():
+            _token_cache.pop(token, None)
+            cached = None
+
+    if cached is None:
+        # A JWS token always has exactly three dot-separated segments
+        if token.count(".") != 2:
             raise credentials_exception
-    except JWTError:
-        raise credentials_exception
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=_ALGORITHMS)
+            email: str = payload.get("sub")
+            if email is None:
+                raise credentials_exception
+        except JWTError:
+            raise credentials_exception
+    else:
+        email = cached[0]
+
+    if cached is not None:
+        user_id = cached[1]
+    else:
+        with _token_cache_lock:
+            user_id = _user_id_cache.get(email)
 
-    user = db.query(models.User).filter(models.User.email == email).first()
-    if user is None:
+    if user_id is None:
+        user = db.execute(_user_by_email, {"email": email}).scalar_one_or_none()
+    else:
+        # Primary key lookup, served from the identity map when already loaded
+        user = db.get(models.User, user_id)
+    if user is None or user.email != email:
+        with _token_cache_lock:
+            _token_cache.pop(token, None)
+            _user_id_cache.pop(email, None)
         raise credentials_exception
 
+    if cached is None:
+        with _token_cache_lock:
+            _token_cache[token] = (email, user.id, payload.get("exp", float("inf")))
+            _user_id_cache[email] = user.id
+
     return user
 
+def invalidate_user_cache(user_id: int):
+    """
+    Drop every cached token and email lookup belonging to a user.
+
+    Must be called whenever the user's email or password changes, or the user is
+    deleted, so that already-decoded tokens are validated again.
+
+    Args:
+        user_id (int): The ID of the user whose cache entries should be forgotten.
+    """
+    with _token_cache_lock:
+        for token, (_, cached_user_id, _) in list(_token_cache.items()):
+            if cached_user_id == user_id:
+                _token_cache.pop(token, None)
+        for email, cached_user_id in list(_user_id_cache.items()):
+            if cached_user_id == user_id:
+                _user_id_cache.pop(email, None)
+
 def get_admin_user(current_user: models.User = Depends(get_current_user)):
     """
     Dependency to ensure the user is an admin.
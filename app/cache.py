@@ -0,0 +1,61 @@
+from typing import Hashable, Optional, Tuple
+import threading
+from cachetools import LRUCache, TTLCache
+
+PARTIES_CACHE_TTL_SECONDS = 60
+
+# Serialized GET /parties/ pages keyed by (skip, limit). Process-local, so every
+# worker keeps its own copy.
+_parties_cache = TTLCache(maxsize=64, ttl=PARTIES_CACHE_TTL_SECONDS)
+# Last page bodies successfully built, kept past invalidation and served only
+# when the database cannot be read.
+_parties_fallback = LRUCache(maxsize=64)
+_parties_cache_lock = threading.Lock()
+_parties_cache_generation = 0
+
+def get_parties_page(key: Hashable) -> Tuple[Optional[bytes], int]:
+    """
+    Look up a cached party list page.
+
+    Args:
+        key (Hashable): The page key, e.g. `(skip, limit)`.
+
+    Returns:
+        Tuple[Optional[bytes], int]: The cached body (or None) and the current cache
+        generation, to be passed back to `store_parties_page`.
+    """
+    with _parties_cache_lock:
+        return _parties_cache.get(key), _parties_cache_generation
+
+def store_parties_page(key: Hashable, body: bytes, generation: int):
+    """
+    Cache a freshly built party list page.
+
+    The page is always kept as the stale fallback, but is only cached for reads if
+    the list was not invalidated since `generation` was taken.
+
+    Args:
+        key (Hashable): The page key, e.g. `(skip, limit)`.
+        body (bytes): The serialized page.
+        generation (int): The generation returned by `get_parties_page` before the read.
+    """
+    with _parties_cache_lock:
+        _parties_fallback[key] = body
+        if generation == _parties_cache_generation:
+            _parties_cache[key] = body
+
+def get_stale_parties_page(key: Hashable) -> Optional[bytes]:
+    """
+    Return the last page built for `key`, even if it has since been invalidated.
+    """
+    with _parties_cache_lock:
+        return _parties_fallback.get(key)
+
+def invalidate_parties_cache():
+    """
+    Forget the cached party list; must be called after any change to parties or attendees.
+    """
+    global _parties_cache_generation
+    with _parties_cache_lock:
+        _parties_cache.clear()
+        _parties_cache_generation += 1
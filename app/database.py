@@ -1,14 +1,45 @@
-from sqlalchemy import create_engine
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import QueuePool
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./dnd_party_planner.db"
 
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=QueuePool,
+    pool_size=20,
+    max_overflow=30,
+    pool_timeout=30,
+    pool_pre_ping=True,
+    pool_recycle=1800,
 )
+
+@event.listens_for(engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Configure every new SQLite connection for concurrent access.
+
+    WAL mode lets readers proceed while a write is in progress, and the remaining
+    pragmas trade a little durability on power loss for fewer fsyncs. Foreign keys
+    are enforced so that `ON DELETE CASCADE` removes dependent rows in the database.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.close()
+
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Thread-local sessions for work outside a request, e.g. scheduler jobs
+ScopedSession = scoped_session(SessionLocal)
+
 Base = declarative_base()
 
 def get_db():
@@ -30,4 +61,28 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+@contextmanager
+def session_scope():
+    """
+    Provide a thread-local session for code that runs outside a request.
+
+    The session is rolled back if the block raises, and removed from the registry
+    afterwards so its connection goes straight back to the pool.
+
+    Yields:
+        Session: The SQLAlchemy database session.
+
+    Example:
+        with session_scope() as db:
+            party = db.query(Party).get(party_id)
+    """
+    db = ScopedSession()
+    try:
+        yield db
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        ScopedSession.remove()
@@ -1,16 +1,28 @@
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import threading
+from functools import lru_cache
+from email.message import EmailMessage
+from typing import Iterable, Optional, Tuple
 import os
 from dotenv import load_dotenv
 
 # Load environment variables from a .env file
 load_dotenv()
 
+SMTP_HOST = "smtp.gmail.com"
+SMTP_PORT = 465
+# Bounds every socket operation, so a stalled server cannot hold the shared lock forever
+SMTP_TIMEOUT_SECONDS = 10
+SMTP_KEEPALIVE_SECONDS = 60
+SMTP_MAX_RECIPIENTS = 50
+
 class EmailService:
     """
     A service for sending emails using Gmail's SMTP server.
 
+    A single authenticated SMTP connection is opened lazily and reused across
+    sends, so a burst of emails pays the TLS handshake and login only once.
+
     Attributes:
         sender_email (str): The Gmail address used for sending emails.
         password (str): The application-specific password for the Gmail account.
@@ -23,6 +35,71 @@ class EmailService:
         """
         self.sender_email = os.getenv("EMAIL_USER")  # Your Gmail address
         self.password = os.getenv("EMAIL_PASSWORD") # Your App Password
+        self._smtp: Optional[smtplib.SMTP_SSL] = None
+        self._lock = threading.Lock()
+        self._keepalive: Optional[threading.Thread] = None
+        self._closed = threading.Event()
+
+    def _get_connection(self) -> smtplib.SMTP_SSL:
+        """
+        Return a live SMTP connection, reconnecting if the current one was dropped.
+
+        Must be called with `self._lock` held.
+        """
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._drop_connection()
+
+        server = smtplib.SMTP_SSL(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT_SECONDS)
+        try:
+            server.login(self.sender_email, self.password)
+        except Exception:
+            server.close()
+            raise
+        self._smtp = server
+        if self._keepalive is None:
+            self._keepalive = threading.Thread(target=self._keepalive_loop, daemon=True)
+            self._keepalive.start()
+        return server
+
+    def _drop_connection(self):
+        """
+        Close the current SMTP connection, ignoring errors from a dead socket.
+
+        Must be called with `self._lock` held.
+        """
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self._smtp.close()
+        self._smtp = None
+
+    def _keepalive_loop(self):
+        """
+        Ping the open connection periodically so the server does not time it out.
+        """
+        while not self._closed.wait(SMTP_KEEPALIVE_SECONDS):
+            with self._lock:
+                if self._smtp is None:
+                    continue
+                try:
+                    self._smtp.noop()
+                except (smtplib.SMTPException, OSError):
+                    self._drop_connection()
+
+    def close(self):
+        """
+        Stop the keepalive thread and close the SMTP connection.
+        """
+        self._closed.set()
+        with self._lock:
+            self._drop_connection()
 
     def send_email(self, recipient_email: str, subject: str, body: str):
         """
@@ -36,17 +113,73 @@ class EmailService:
         Raises:
             smtplib.SMTPException: If an error occurs during the email sending process.
         """
-        message = MIMEMultipart()
+        message = self._build_message(recipient_email, subject, body)
+        
+        with self._lock:
+            self._get_connection().send_message(message)
+
+    def send_batch(self, messages: Iterable[Tuple[str, str, str]]):
+        """
+        Send several individual emails over the shared SMTP connection.
+
+        The lock is held for the whole batch, so the messages go out back to back
+        without interleaving with other sends or re-checking the connection.
+
+        Args:
+            messages (Iterable[Tuple[str, str, str]]): (recipient_email, subject, body) tuples.
+
+        Raises:
+            smtplib.SMTPException: If an error occurs during the email sending process.
+        """
+        emails = [self._build_message(*message) for message in messages]
+        if not emails:
+            return
+        with self._lock:
+            server = self._get_connection()
+            for email in emails:
+                server.send_message(email)
+
+    def send_bulk(self, recipients: Iterable[str], subject: str, body: str):
+        """
+        Send the same email to many recipients using as few messages as possible.
+
+        Recipients are Bcc'd in chunks of `SMTP_MAX_RECIPIENTS`, so each chunk is a
+        single SMTP transaction and no recipient sees the others' addresses.
+
+        Args:
+            recipients (Iterable[str]): The recipients' email addresses.
+            subject (str): The subject of the email.
+            body (str): The body of the email.
+
+        Raises:
+            smtplib.SMTPException: If an error occurs during the email sending process.
+        """
+        recipients = list(recipients)
+        with self._lock:
+            for start in range(0, len(recipients), SMTP_MAX_RECIPIENTS):
+                chunk = recipients[start:start + SMTP_MAX_RECIPIENTS]
+                message = self._build_message(self.sender_email, subject, body)
+                message["Bcc"] = ", ".join(chunk)
+
+                self._get_connection().send_message(message, from_addr=self.sender_email, to_addrs=chunk)
+
+    def _build_message(self, recipient_email: str, subject: str, body: str) -> EmailMessage:
+        """
+        Build a plain-text message from the sender, addressed To `recipient_email`.
+        """
+        message = EmailMessage()
         message["From"] = self.sender_email
         message["To"] = recipient_email
         message["Subject"] = subject
-        
-        message.attach(MIMEText(body, "plain"))
-        
-        # Using Gmail's SMTP settings
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-            server.login(self.sender_email, self.password)
-            server.send_message(message)
+        message.set_content(body)
+        return message
+
+@lru_cache(maxsize=1)
+def get_email_service() -> EmailService:
+    """
+    Return the process-wide EmailService, creating it on first use.
+    """
+    return EmailService()
 
 # Example usage
 # if __name__ == "__main__":
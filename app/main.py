@@ -1,13 +1,47 @@
-from app import models
+from app import models, auth
 from app.routes import admin_routes, auth_routes, party_routes, user_routes
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from app.database import engine
+from app.email_service import get_email_service
+from app.schedular import get_party_scheduler
 from fastapi.middleware.cors import CORSMiddleware
+import os
 
 
 models.Base.metadata.create_all(bind=engine)
+# create_all skips tables that already exist, so add any indexes they are missing
+for table in models.Base.metadata.sorted_tables:
+    for index in table.indexes:
+        index.create(bind=engine, checkfirst=True)
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
+
+@app.on_event("startup")
+def configure_bcrypt_rounds():
+    """
+    Raise the bcrypt cost factor above 12 if this host is fast enough, unless BCRYPT_ROUNDS is set explicitly.
+    """
+    if "BCRYPT_ROUNDS" not in os.environ:
+        auth.BCRYPT_ROUNDS = auth.calibrate_bcrypt_rounds()
+    print(f"Using bcrypt cost factor {auth.BCRYPT_ROUNDS}.")
+
+@app.on_event("startup")
+def start_scheduler():
+    """
+    Start the reminder scheduler so jobs persisted before a restart are picked up.
+    """
+    get_party_scheduler()
+
+@app.on_event("shutdown")
+def close_services():
+    """
+    Stop the reminder scheduler and close the SMTP connection, if they were started.
+    """
+    if get_party_scheduler.cache_info().currsize:
+        get_party_scheduler().shutdown()
+    if get_email_service.cache_info().currsize:
+        get_email_service().close()
 
 @app.get("/")
 async def root():
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime, Table, Text
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String, DateTime, Table, Text
 from sqlalchemy import Enum as SQLAlchemyEnum
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -24,6 +24,10 @@ party_invites = Table(
     Column('status', SQLAlchemyEnum(InviteStatus), default=InviteStatus.PENDING),
 )
 
+# The primary keys lead with party_id; these serve lookups that start from the user
+Index('ix_party_attendees_user_party', party_attendees.c.user_id, party_attendees.c.party_id, unique=True)
+Index('ix_party_invites_user_party', party_invites.c.user_id, party_invites.c.party_id, unique=True)
+
 class User(Base):
     __tablename__ = "users"
     
@@ -34,10 +38,10 @@ class User(Base):
     is_admin = Column(Boolean, default=False, index=True)
 
     # Relationship for parties created by the user
-    created_parties = relationship("Party", back_populates="creator", doc="Parties created by the user.")
+    created_parties = relationship("Party", back_populates="creator", cascade="all, delete-orphan", passive_deletes=True, doc="Parties created by the user.")
 
     # Relationship for parties the user is attending
-    attending_parties = relationship("Party", secondary=party_attendees, back_populates="attendees", doc="Parties the user is attending.")
+    attending_parties = relationship("Party", secondary=party_attendees, back_populates="attendees", passive_deletes=True, doc="Parties the user is attending.")
 
 
 class Party(Base):
@@ -54,7 +58,7 @@ class Party(Base):
     creator = relationship("User", back_populates="created_parties", doc="The user who created the party.")
 
     # Relationship for attendees of the party
-    attendees = relationship("User", secondary=party_attendees, back_populates="attending_parties", doc="Users attending the party.")
+    attendees = relationship("User", secondary=party_attendees, back_populates="attending_parties", passive_deletes=True, doc="Users attending the party.")
 
     # Relationship for invites to the party
-    invites = relationship("User", secondary=party_invites, doc="Users invited to the party.")
\ No newline at end of file
+    invites = relationship("User", secondary=party_invites, passive_deletes=True, doc="Users invited to the party.")
\ No newline at end of file
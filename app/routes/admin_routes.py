@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app import models, schemas, auth
 from app.database import get_db
+from app.cache import invalidate_parties_cache
 from typing import List
 
 router = APIRouter()
@@ -30,4 +31,6 @@ def delete_user(
         raise HTTPException(status_code=404, detail="User not found")
     db.delete(user)
     db.commit()
+    auth.invalidate_user_cache(user_id)
+    invalidate_parties_cache()
     return {"message": "User deleted successfully"}
\ No newline at end of file
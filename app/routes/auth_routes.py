@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from datetime import timedelta
 from app import models, schemas, auth
@@ -19,12 +20,8 @@ def signup(user: schemas.UserCreate, db: Session = Depends(get_db)):
         schemas.User: The newly created user object with details such as email and username.
 
     Raises:
-        HTTPException: If the email is already registered, raises a 400 status error.
+        HTTPException: If the email or username is already registered, raises a 400 status error.
     """
-    db_user = db.query(models.User).filter(models.User.email == user.email).first()
-    if db_user:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    
     hashed_password = auth.get_password_hash(user.password)
     db_user = models.User(
         email=user.email,
@@ -32,7 +29,14 @@ def signup(user: schemas.UserCreate, db: Session = Depends(get_db)):
         hashed_password=hashed_password
     )
     db.add(db_user)
-    db.commit()
+    # Let the unique indexes reject duplicates instead of checking first
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        if "users.username" in str(e.orig):
+            raise HTTPException(status_code=400, detail="Username already taken")
+        raise HTTPException(status_code=400, detail="Email already registered")
     db.refresh(db_user)
     return db_user
 
@@ -1,22 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, Response
+from sqlalchemy import exists, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, selectinload
 from typing import List
+import orjson
 from app import models, schemas, auth
+from app.cache import get_parties_page, get_stale_parties_page, invalidate_parties_cache, store_parties_page
 from app.database import get_db
-from app.schedular import PartyScheduler
-from app.email_service import EmailService
+from app.schedular import PartyScheduler, get_party_scheduler
+from app.email_service import EmailService, get_email_service
 from app.models import InviteStatus, party_invites, party_attendees
 
 router = APIRouter()
-email_service = EmailService()
-party_scheduler = PartyScheduler()
 
 @router.post("/", response_model=schemas.Party)
 def create_party(
     party: schemas.PartyCreate,
     background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    current_user: models.User = Depends(auth.get_current_user),
+    email_service: EmailService = Depends(get_email_service),
+    party_scheduler: PartyScheduler = Depends(get_party_scheduler)
 ):
     """
     Create a new D&D party and send invites to the provided email addresses.
@@ -26,6 +31,8 @@ def create_party(
         background_tasks (BackgroundTasks): FastAPI utility for managing asynchronous tasks like sending emails.
         db (Session): Database session dependency.
         current_user (models.User): The currently authenticated user.
+        email_service (EmailService): The shared email service.
+        party_scheduler (PartyScheduler): The shared reminder scheduler.
 
     Returns:
         schemas.Party: The newly created party details.
@@ -37,35 +44,54 @@ def create_party(
     Raises:
         HTTPException: If any database operation fails or email notification encounters an error.
     """
-    db_party = models.Party(**party.dict(exclude={'invite_emails'}), creator_id=current_user.id)
-    db.add(db_party)
-    db.commit()
-    db.refresh(db_party)
-    
-    # Schedule party reminder
-    party_scheduler.schedule_party_reminder(db_party.id, db_party.date_time)
-    
-    # Send invites
-    unique_emails = set(party.invite_emails)
-    for email in unique_emails:
-        invited_user = db.query(models.User).filter(models.User.email == email).first()
-        if invited_user:
+    # Party and invites are written in one transaction, so a failure leaves neither
+    try:
+        db_party = models.Party(**party.dict(exclude={'invite_emails'}), creator_id=current_user.id)
+        db.add(db_party)
+        db.flush()  # Assigns db_party.id without a commit + refresh round-trip
+        party_id = db_party.id
+        
+        # Send invites
+        unique_emails = set(party.invite_emails)
+        id_by_email = dict(
+            db.query(models.User.email, models.User.id)
+            .filter(models.User.email.in_(unique_emails))
+            .all()
+        )
+        if id_by_email:
             db.execute(
-                party_invites.insert().values(
-                    user_id=invited_user.id,
-                    party_id=db_party.id,
-                    status=InviteStatus.PENDING
-                )
-            )
-            background_tasks.add_task(
-                email_service.send_email,
-                email,
-                f"Invitation to D&D Party: {party.title}",
-                f"You've been invited to join {current_user.username}'s D&D party!"
+                party_invites.insert(),
+                [
+                    {"user_id": user_id, "party_id": party_id, "status": InviteStatus.PENDING}
+                    for user_id in id_by_email.values()
+                ]
             )
-    
-    db.commit()
-    return db_party
+        invited_emails = list(id_by_email)
+        
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+    invalidate_parties_cache()
+
+    # Schedule party reminder once the response has been sent
+    background_tasks.add_task(party_scheduler.schedule_party_reminder, party_id, party.date_time)
+
+    # One background task for all invitees, sent as Bcc'd batches
+    if invited_emails:
+        background_tasks.add_task(
+            email_service.send_bulk,
+            invited_emails,
+            f"Invitation to D&D Party: {party.title}",
+            f"You've been invited to join {current_user.username}'s D&D party!"
+        )
+    # Reload with attendees in one batched query instead of refresh + lazy load
+    return (
+        db.query(models.Party)
+        .options(selectinload(models.Party.attendees))
+        .filter(models.Party.id == party_id)
+        .one()
+    )
 
 @router.put("/{party_id}/respond-invite")
 def respond_to_invite(
@@ -73,7 +99,8 @@ def respond_to_invite(
     accept: bool,
     background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    current_user: models.User = Depends(auth.get_current_user),
+    email_service: EmailService = Depends(get_email_service)
 ):
     """
     Respond to a party invitation (accept or decline).
@@ -84,6 +111,7 @@ def respond_to_invite(
         background_tasks (BackgroundTasks): FastAPI utility for asynchronous email notification.
         db (Session): Database session dependency.
         current_user (models.User): The currently authenticated user.
+        email_service (EmailService): The shared email service.
 
     Returns:
         dict: A success message indicating the response.
@@ -99,44 +127,40 @@ def respond_to_invite(
             - 500: If a database error occurs.
     """
     try:
-        # Retrieve the party
-        party = db.query(models.Party).filter(models.Party.id == party_id).first()
+        # Retrieve the party together with its creator's email
+        party = db.execute(
+            select(models.Party.id, models.User.email.label("creator_email"))
+            .join(models.Party.creator)
+            .where(models.Party.id == party_id)
+        ).first()
         if not party:
             raise HTTPException(status_code=404, detail="Party not found")
         
-        # Check for an invite
-        invite = db.execute(
-            party_invites.select()
-            .where(party_invites.c.user_id == current_user.id)
-            .where(party_invites.c.party_id == party_id)
-        ).first()
-        
-        if not invite:
-            raise HTTPException(status_code=404, detail="Invite not found")
-        
-        # Update the invite status
+        # Update the invite status; no matching row means there is no invite
         status = InviteStatus.ACCEPTED if accept else InviteStatus.DECLINED
-        db.execute(
+        result = db.execute(
             party_invites.update()
             .where(party_invites.c.user_id == current_user.id)
             .where(party_invites.c.party_id == party_id)
             .values(status=status)
         )
+        if result.rowcount == 0:
+            raise HTTPException(status_code=404, detail="Invite not found")
         
-        # Add user to attendees if accepted
+        # Add user to attendees if accepted; accepting twice is a no-op
         if accept:
             db.execute(
-                party_attendees.insert().values(
+                sqlite_insert(party_attendees).values(
                     user_id=current_user.id,
                     party_id=party_id
-                )
+                ).on_conflict_do_nothing()
             )
         
         # Notify the party creator
         try:
             background_tasks.add_task(
                 email_service.send_email,
-                party.creator.email,
+                party.creator_email,
                 f"Response to Party Invitation",
                 f"{current_user.username} has {status.name} your party invitation!"
             )
@@ -144,18 +168,25 @@ def respond_to_invite(
             print(f"Failed to send email: {e}")
         
         db.commit()  # Commit only once at the end
+        if accept:
+            invalidate_parties_cache()
         return {"message": f"Successfully {status.name} invitation"}
     
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()  # Rollback if any error occurs
         raise HTTPException(status_code=500, detail=str(e))
     
-@router.put("/{party_id}")
+@router.put("/{party_id}", response_model=schemas.Party)
 def update_party(
     party_id: int,
     party_update: schemas.PartyUpdate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    current_user: models.User = Depends(auth.get_current_user),
+    party_scheduler: PartyScheduler = Depends(get_party_scheduler)
 ):
     """
     Update the details of a party.
@@ -163,19 +194,20 @@ def update_party(
     Args:
         party_id (int): The ID of the party to update.
         party_update (schemas.PartyUpdate): The updated party details.
+        background_tasks (BackgroundTasks): FastAPI utility for rescheduling the reminder after the response.
         db (Session): Database session dependency.
         current_user (models.User): The currently authenticated user.
+        party_scheduler (PartyScheduler): The shared reminder scheduler.
 
     Returns:
         schemas.Party: The updated party details.
 
     Side Effects:
-        - Reschedules the party reminder if the date or time is changed.
+        - Reschedules the party reminder in the background if the date or time is changed.
 
     Raises:
         HTTPException:
             - 404: If the party is not found or the user is unauthorized.
-            - 500: If rescheduling the reminder fails.
     """
     # party = db.query(models.Party).filter(models.Party.id == party_id).first()
     # if not party or party.creator_id != current_user.id:
@@ -204,10 +236,11 @@ def update_party(
         raise HTTPException(status_code=404, detail="Party not found or unauthorized")
     
     old_date_time = party.date_time
+    changes = party_update.dict(exclude_unset=True)
+    new_date_time = changes.pop("date_time", None)
 
     # Ensure both old and new date_time are timezone-aware
-    if party_update.date_time:
-        new_date_time = party_update.date_time
+    if new_date_time:
         if old_date_time.tzinfo is None:
             old_date_time = old_date_time.replace(tzinfo=new_date_time.tzinfo)
     
@@ -216,21 +249,23 @@ def update_party(
 
         # Update and reschedule if date_time has changed
         if new_date_time != old_date_time:
-            try:
-                party_scheduler.remove_party_reminder(party_id)
-                party_scheduler.schedule_party_reminder(party_id, new_date_time)
-                party.date_time = new_date_time
-            except Exception as e:
-                raise HTTPException(status_code=500, detail=f"Failed to reschedule reminder: {e}")
+            party.date_time = new_date_time
+            # Replaces the old reminder, or removes it if the new one would be in the past
+            background_tasks.add_task(party_scheduler.schedule_party_reminder, party_id, new_date_time)
 
     # Update other fields
-    for field, value in party_update.dict(exclude_unset=True).items():
-        if field != "date_time":
-            setattr(party, field, value)
+    for field, value in changes.items():
+        setattr(party, field, value)
     
     db.commit()
-    db.refresh(party)
-    return party
+    invalidate_parties_cache()
+    # Reload with attendees in one batched query instead of refresh + lazy load
+    return (
+        db.query(models.Party)
+        .options(selectinload(models.Party.attendees))
+        .filter(models.Party.id == party_id)
+        .one()
+    )
 
 
 @router.delete("/{party_id}")
@@ -258,38 +293,74 @@ def delete_party(
             - 404: If the party is not found or the user is unauthorized.
             - 500: If a database error occurs during deletion.
     """
-    party = db.query(models.Party).filter(models.Party.id == party_id, models.Party.creator_id == current_user.id).first()
-    if not party:
+    # The ownership check is part of the DELETE; invites and attendees are
+    # removed by ON DELETE CASCADE
+    deleted = (
+        db.query(models.Party)
+        .filter(models.Party.id == party_id, models.Party.creator_id == current_user.id)
+        .delete(synchronize_session=False)
+    )
+    if not deleted:
         raise HTTPException(status_code=404, detail="Party not found or unauthorized")
 
-    # Delete related data
-    db.execute(party_invites.delete().where(party_invites.c.party_id == party_id))
-    db.execute(party_attendees.delete().where(party_attendees.c.party_id == party_id))
-    db.delete(party)
-
     try:
         db.commit()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    invalidate_parties_cache()
     return {"message": "Party and all related data deleted successfully"}
 
 
 @router.get("/", response_model=List[schemas.Party])
 def list_parties(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth.get_current_user)
 ):
     """
-    List all D&D parties.
+    List D&D parties, one page at a time.
 
     Args:
+        skip (int): The number of parties to skip, ordered by ID.
+        limit (int): The maximum number of parties to return.
         db (Session): Database session dependency.
         current_user (models.User): The currently authenticated user.
 
     Returns:
-        List[schemas.Party]: A list of all parties.
+        List[schemas.Party]: The requested page of parties.
+
+    Notes:
+        - Each serialized page is cached for `app.cache.PARTIES_CACHE_TTL_SECONDS`, or until a
+          party or its attendees change.
+        - If the database cannot be read, the last page served is returned instead,
+          marked with a `Warning: 110` header.
     """
-    return db.query(models.Party).all()
+    key = (skip, limit)
+    cached, generation = get_parties_page(key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+
+    # schemas.Party serializes attendees, so load them all in one extra query
+    try:
+        parties = (
+            db.query(models.Party)
+            .options(selectinload(models.Party.attendees))
+            .order_by(models.Party.id)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+    except SQLAlchemyError:
+        fallback = get_stale_parties_page(key)
+        if fallback is None:
+            raise
+        return Response(content=fallback, media_type="application/json", headers={"Warning": '110 - "Response is Stale"'})
+    body = orjson.dumps([schemas.Party.from_orm(party).dict() for party in parties])
+
+    # Not cached for reads if the list was invalidated while we were reading it
+    store_parties_page(key, body, generation)
+    return Response(content=body, media_type="application/json")
 
 
 
@@ -298,7 +369,8 @@ def request_to_join(
     party_id: int,
     background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    current_user: models.User = Depends(auth.get_current_user),
+    email_service: EmailService = Depends(get_email_service)
 ):
     """
     Request to join a D&D party.
@@ -308,6 +380,7 @@ def request_to_join(
         background_tasks (BackgroundTasks): FastAPI utility for asynchronous email notification.
         db (Session): Database session dependency.
         current_user (models.User): The currently authenticated user.
+        email_service (EmailService): The shared email service.
 
     Returns:
         dict: A success message indicating that the join request was sent.
@@ -321,32 +394,30 @@ def request_to_join(
             - 404: If the party is not found.
             - 400: If the user has already requested to join.
     """
-    party = db.query(models.Party).filter(models.Party.id == party_id).first()
+    party = db.execute(
+        select(models.Party.id, models.User.email.label("creator_email"))
+        .join(models.Party.creator)
+        .where(models.Party.id == party_id)
+    ).first()
     if not party:
         raise HTTPException(status_code=404, detail="Party not found")
     
-    db.execute(
-        party_invites.insert().values(
+    # Insert the request unless one already exists, deciding both in one statement
+    result = db.execute(
+        sqlite_insert(party_invites).values(
             user_id=current_user.id,
             party_id=party_id,
             status=InviteStatus.PENDING
-        )
+        ).on_conflict_do_nothing()
     )
 
-    # Check if the user has already requested to join
-    existing_request = db.execute(
-        party_invites.select()
-        .where(party_invites.c.user_id == current_user.id)
-        .where(party_invites.c.party_id == party_id)
-    ).first()
-
-    if existing_request:
+    if result.rowcount == 0:
         raise HTTPException(status_code=400, detail="You have already requested to join this party")
         
     # Notify party creator
     background_tasks.add_task(
         email_service.send_email,
-        party.creator.email,
+        party.creator_email,
         f"New Join Request",
         f"{current_user.username} has requested to join your party!"
     )
@@ -381,14 +452,20 @@ def remove_attendee(
         HTTPException:
             - 404: If the party is not found or the user is unauthorized.
     """
-    party = db.query(models.Party).filter(models.Party.id == party_id).first()
-    if not party or party.creator_id != current_user.id:
-        raise HTTPException(status_code=404, detail="Party not found or unauthorized")
-    
-    db.execute(
+    owns_party = (
+        exists()
+        .where(models.Party.id == party_id)
+        .where(models.Party.creator_id == current_user.id)
+    )
+    result = db.execute(
         party_attendees.delete()
         .where(party_attendees.c.user_id == user_id)
         .where(party_attendees.c.party_id == party_id)
+        .where(owns_party)
     )
+    # Nothing deleted: either not the creator, or the user was not attending
+    if result.rowcount == 0 and not db.query(owns_party).scalar():
+        raise HTTPException(status_code=404, detail="Party not found or unauthorized")
     db.commit()
+    invalidate_parties_cache()
     return {"message": "Attendee removed successfully"}
\ No newline at end of file
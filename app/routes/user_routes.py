@@ -1,11 +1,11 @@
-import enum
-from http.client import HTTPException
 from typing import List
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app import models, schemas, auth
 from app.database import get_db
-from app.models import party_invites, party_attendees
+from app.models import party_invites
+from app.cache import invalidate_parties_cache
 
 router = APIRouter()
 
@@ -40,6 +40,10 @@ def update_user(
         current_user.hashed_password = auth.get_password_hash(user_update.password)
     
     db.commit()
+    if user_update.email or user_update.password:
+        auth.invalidate_user_cache(current_user.id)
+    if user_update.username or user_update.email:
+        invalidate_parties_cache()
     db.refresh(current_user)
     return current_user
 
@@ -119,17 +123,15 @@ def delete_user_account(
     Returns:
         dict: A confirmation message indicating that the account was successfully deleted.
     """
-    # Delete related party data
-    db.execute(party_invites.delete().where(party_invites.c.user_id == current_user.id))
-    db.execute(party_attendees.delete().where(party_attendees.c.user_id == current_user.id))
-    db.execute(models.Party.__table__.delete().where(models.Party.creator_id == current_user.id))
-
-    # Delete the user
+    # Delete the user; their parties, invites and attendance are removed by ON DELETE CASCADE
+    user_id = current_user.id
     db.delete(current_user)
     try:
         db.commit()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    auth.invalidate_user_cache(user_id)
+    invalidate_parties_cache()
     return {"message": "Account and all related data deleted successfully"}
 
 # Invites 
@@ -149,17 +151,9 @@ def list_user_invites(
     Returns:
         List[schemas.Invite]: A list of invites with their statuses.
     """
-    invites = db.execute(
-        party_invites.select()
+    # Only the columns in schemas.Invite; the rows are validated via orm_mode as-is.
+    # Served by the (user_id, party_id) index.
+    return db.execute(
+        select(party_invites.c.party_id, party_invites.c.status)
         .where(party_invites.c.user_id == current_user.id)
-    ).fetchall()
-
-    # Transform invites to match the schema
-    return [
-        {
-            "party_id": invite.party_id,
-            "user_id": invite.user_id,
-            "status": invite.status.value if isinstance(invite.status, enum.Enum) else invite.status
-        }
-        for invite in invites
-    ]
\ No newline at end of file
+    ).all()
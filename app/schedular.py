@@ -1,9 +1,14 @@
 from app.models import Party
+from sqlalchemy.orm import selectinload
+from apscheduler.executors.pool import ThreadPoolExecutor
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.date import DateTrigger
 from datetime import datetime, timedelta
-from app.email_service import EmailService
-from app.database import SessionLocal
+from functools import lru_cache
+from typing import List
+from app.email_service import get_email_service
+from app.database import engine, session_scope
 
 
 class PartyScheduler:
@@ -19,10 +24,17 @@ class PartyScheduler:
         """
         Initialize the PartyScheduler.
 
-        Starts the background scheduler and sets up the email service for sending reminders.
+        Starts the background scheduler and uses the shared email service for sending reminders.
+        Jobs are stored in the application database, so reminders survive restarts.
+        Each process runs its own scheduler over that store, so the app must run with
+        a single worker or reminders will be sent once per worker.
         """
-        self.scheduler = BackgroundScheduler()
-        self.email_service = EmailService()
+        self.scheduler = BackgroundScheduler(
+            jobstores={"default": SQLAlchemyJobStore(engine=engine)},
+            executors={"default": ThreadPoolExecutor(20)},
+            job_defaults={"coalesce": True, "misfire_grace_time": 300},
+        )
+        self.email_service = get_email_service()
         self.scheduler.start()
 
     def schedule_party_reminder(self, party_id: int, party_time: datetime):
@@ -34,20 +46,28 @@ class PartyScheduler:
             party_time (datetime): The date and time of the party.
 
         Side Effects:
-            - Adds a job to the scheduler to send a reminder email 1 hour before the party.
+            - Adds or replaces the job that sends a reminder email 1 hour before the party.
 
         Notes:
-            - A reminder is scheduled only if the reminder time is in the future.
+            - A reminder is scheduled only if the reminder time is in the future;
+              otherwise any existing reminder for the party is removed.
         """
         reminder_time = party_time - timedelta(hours=1)
-        if reminder_time > datetime.now():
-            self.scheduler.add_job(
-                self._send_party_reminder,
-                trigger=DateTrigger(run_date=reminder_time),
-                args=[party_id],
-                id=f"party_reminder_{party_id}",
-                replace_existing=True
-            )
+        try:
+            # Compare in the party's own timezone; naive times stay naive
+            if reminder_time > datetime.now(reminder_time.tzinfo):
+                self.scheduler.add_job(
+                    send_party_reminder,
+                    trigger=DateTrigger(run_date=reminder_time),
+                    args=[party_id],
+                    id=f"party_reminder_{party_id}",
+                    replace_existing=True
+                )
+            else:
+                self.remove_party_reminder(party_id)
+        except Exception as e:
+            # Runs as a background task after the response, so nothing else reports it
+            print(f"Failed to schedule reminder for party {party_id}: {e}")
 
     def _send_party_reminder(self, party_id: int):
         """
@@ -57,22 +77,37 @@ class PartyScheduler:
             party_id (int): The unique ID of the party.
 
         Side Effects:
-            - Sends an email reminder to each attendee of the party.
+            - Sends an email reminder to each attendee of the party in one batch.
+        """
+        self._send_party_reminders_batch([party_id])
+
+    def _send_party_reminders_batch(self, party_ids: List[int]):
+        """
+        Internal method to send reminder emails to the attendees of several parties.
+
+        Args:
+            party_ids (List[int]): The unique IDs of the parties.
+
+        Side Effects:
+            - Sends all reminders over one SMTP session.
 
         Notes:
-            - Uses the database to fetch party details and attendees.
+            - Parties and their attendees are fetched with one query each, and the
+              database session is released before any email is sent.
         """
-        db = SessionLocal()
-        try:
-            party = db.query(Party).filter(Party.id == party_id).first()
-            if party:
-                # Send reminder to all attendees
-                for attendee in party.attendees:
-                    self.email_service.send_email(
-                        recipient_email=attendee.email,
-                        subject=f"Reminder: D&D Party '{party.title}' starts in 1 hour!",
-                        body=f"""
-                        Hello {attendee.username}!
+        messages = []
+        with session_scope() as db:
+            parties = (
+                db.query(Party)
+                .options(selectinload(Party.attendees))
+                .filter(Party.id.in_(party_ids))
+                .all()
+            )
+            for party in parties:
+                # Everything but the greeting is the same for every attendee, so build it once
+                subject = f"Reminder: D&D Party '{party.title}' starts in 1 hour!"
+                body_template = f"""
+                        Hello {{username}}!
 
                         This is a reminder that the D&D party '{party.title}' starts in 1 hour!
                         
@@ -83,9 +118,18 @@ class PartyScheduler:
                         
                         Don't forget to join on time!
                         """
-                    )
-        finally:
-            db.close()
+                messages.extend(
+                    (attendee.email, subject, body_template.replace("{username}", attendee.username, 1))
+                    for attendee in party.attendees
+                )
+
+        self.email_service.send_batch(messages)
+
+    def shutdown(self):
+        """
+        Stop the background scheduler without waiting for running jobs.
+        """
+        self.scheduler.shutdown(wait=False)
 
     def remove_party_reminder(self, party_id: int):
         """
@@ -100,3 +144,24 @@ class PartyScheduler:
         job_id = f"party_reminder_{party_id}"
         if self.scheduler.get_job(job_id):
             self.scheduler.remove_job(job_id)
+
+
+def send_party_reminder(party_id: int):
+    """
+    Job entry point for party reminders.
+
+    Persisted jobs must reference a module-level function rather than a bound
+    method, so this forwards to the process-wide scheduler.
+
+    Args:
+        party_id (int): The unique ID of the party.
+    """
+    get_party_scheduler()._send_party_reminder(party_id)
+
+
+@lru_cache(maxsize=1)
+def get_party_scheduler() -> PartyScheduler:
+    """
+    Return the process-wide PartyScheduler, creating and starting it on first use.
+    """
+    return PartyScheduler()
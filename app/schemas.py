@@ -1,6 +1,7 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, validator
 from typing import List, Optional
 from datetime import datetime
+from app.models import InviteStatus
 
 class LoginRequest(BaseModel):
     email: EmailStr
@@ -58,6 +59,15 @@ class PartyCreate(PartyBase):
     """
     invite_emails: List[EmailStr]
 
+    @validator("invite_emails", pre=True)
+    def dedupe_invite_emails(cls, value):
+        """
+        Drop repeated addresses before EmailStr validation, keeping first-seen order.
+        """
+        if isinstance(value, list):
+            return list(dict.fromkeys(value))
+        return value
+
 class PartyUpdate(BaseModel):
     """
     Schema for updating party details.
@@ -86,7 +96,7 @@ class Invite(BaseModel):
     Includes the party ID and the status of the invitation.
     """
     party_id: int
-    status: str  # Could be "pending", "accepted", or "declined"
+    status: InviteStatus  # Serialized as "PENDING", "ACCEPTED" or "DECLINED"
 
     class Config:
         orm_mode = True